@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Check the spooled result reader in ormcp_client_example.py - no server needed
+
+Spools tricky tool responses and compares what SpooledResponse reads back
+with json.loads on the same data, at every small chunk size.
+
+python check_spooled_response.py
+"""
+
+import json
+import sys
+import tempfile
+
+import ormcp_client_example
+from ormcp_client_example import SpooledResponse
+
+
+def check() -> bool:
+    """Return True if SpooledResponse matches json.loads on every response and chunk size"""
+    rows = [
+        {"id": 1, "name": 'quote " backslash \\ slash / newline \n tab \t', "tags": ["]", "{", "\\"]},
+        {"id": 2, "name": "caf\u00e9 \U0001F600 \u2028", "children": [], "address": {}},
+        {"id": -3, "score": 1.5e-7, "active": False, "manager": None},
+    ]
+    results = [
+        {"content": [{"type": "text", "text": json.dumps(rows, indent=2, ensure_ascii=False)},
+                     {"type": "text", "text": json.dumps(rows)}],
+         "structuredContent": {"result": rows}, "isError": False},
+        {"content": [{"type": "text", "text": "[]"}, {"type": "text", "text": "42"}], "isError": False},
+        {"content": []},
+        {"content": [{"type": "text", "text": "Error: table not found"}], "isError": True},
+        {"content": [{"type": "text", "text": "[Errno 2] No such file or directory: 'x'"}], "isError": True},
+        {"content": [{"type": "text", "text": json.dumps(list(range(25)))}], "isError": True},
+        {"content": [{"type": "text", "text": "{not json}"}, {"type": "text", "text": " [1, 2] "}]},
+        {"isError": True, "content": [{"type": "text", "text": "Error: bad filter"}], "_meta": {}},
+    ]
+    responses = [{"jsonrpc": "2.0", "id": 1, "result": result} for result in results]
+    responses.append({"jsonrpc": "2.0", "id": 1, "error": {"code": -32602, "message": "Invalid params"}})
+
+    cases = failures = 0
+    for response in responses:
+        result = response.get("result", {})
+        expected_objects = []
+        for item in result.get("content", []):
+            try:
+                value = json.loads(item["text"])
+            except ValueError:
+                value = item["text"]
+            expected_objects.extend(value if isinstance(value, list) else [value])
+        expected_error = response.get("error")
+        if result.get("isError"):
+            expected_error = {"isError": True, "messages": expected_objects[:ormcp_client_example.ERROR_MESSAGE_LIMIT]}
+
+        for ensure_ascii in (True, False):
+            payload = json.dumps(response, ensure_ascii=ensure_ascii)
+            bodies = (
+                payload,
+                f"event: message\r\ndata: {payload}\r\n\r\n",
+                f": ping - 2025-01-01 00:00:00.000000+00:00\r\n\r\nevent: message\r\ndata: {payload}\r\n\r\n",
+                f"id: 7\nevent: message\ndata:{payload}\n\n",
+            )
+            for body in bodies:
+                data = body.encode("utf-8")
+                for chunk_size in range(1, 14):  # Puts chunk boundaries inside every escape
+                    cases += 1
+                    spool_file = tempfile.TemporaryFile()
+                    spool_file.write(data)
+                    ormcp_client_example.READ_CHUNK_SIZE = chunk_size
+                    with SpooledResponse(spool_file, len(data)) as spooled:
+                        try:
+                            ok = spooled.error() == expected_error and list(spooled) == expected_objects
+                        except ValueError as e:
+                            ok = False
+                            print(f"❌ {e}")
+                    if not ok:
+                        failures += 1
+                        print(f"❌ Mismatch with chunk_size={chunk_size}: {body[:80]}")
+
+    if failures:
+        print(f"❌ Self-check failed: {failures} of {cases} case(s)")
+        return False
+    print(f"✅ Self-check passed: {cases} case(s)")
+    return True
+
+
+if __name__ == "__main__":
+    sys.exit(0 if check() else 1)
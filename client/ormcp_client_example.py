@@ -6,25 +6,375 @@ MCP Client - Connect to MCP servers via stdio or HTTP
 python ormcp_client_example.py --mode http --url http://127.0.0.1:8080 --demo
 """
 
+import codecs
+import itertools
 import json
+from json.decoder import scanstring
+import re
 import psutil
 import subprocess
+import tempfile
 import requests
 import argparse
 import sys
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Union
 import time
 import threading
 
 
+READ_CHUNK_SIZE = 64 * 1024  # Bytes read per chunk when streaming or spooling a response
+SSE_LINE_LIMIT = 1024  # Bytes read at a time while looking for the SSE data line
+ERROR_MESSAGE_LIMIT = 10  # Values kept from the content of a tool result flagged isError
+
+_CONTAINER_SPECIAL = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r'[,\]}\s]')
+_NON_WHITESPACE = re.compile(r'\S')
+_END = object()  # Marks an exhausted iterator
+# isError as the last member of the last top-level member (the result)
+_TRAILING_IS_ERROR = re.compile(r'[{,]\s*"isError"\s*:\s*(true|false)\s*}\s*}\s*$')
+
+
+class _JsonStream:
+    """Pull-style reader over JSON text arriving in chunks.
+
+    Only the value currently being read is held in memory, so large
+    documents can be walked member by member without parsing the whole tree.
+    """
+
+    def __init__(self, chunks: Iterable[str]):
+        self._chunks = iter(chunks)
+        self._buf = ""
+        self._pos = 0
+        self._decoder = json.JSONDecoder()
+
+    def _fill(self, at_least: int = 1) -> bool:
+        """Append at least at_least more characters to the buffer, dropping consumed text"""
+        pieces = [self._buf[self._pos:]]
+        added = 0
+        for chunk in self._chunks:
+            pieces.append(chunk)
+            added += len(chunk)
+            if added >= at_least:
+                break
+        self._buf = "".join(pieces)
+        self._pos = 0
+        return added > 0
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ('' at EOF)"""
+        while True:
+            m = _NON_WHITESPACE.search(self._buf, self._pos)
+            if m:
+                self._pos = m.start()
+                return m.group()
+            self._pos = len(self._buf)
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str):
+        c = self.peek()
+        if c != char:
+            raise ValueError(f"Expected '{char}' in JSON response, found '{c}'")
+        self._pos += 1
+
+    def _iter_string_rest(self) -> Iterator[str]:
+        """Yield decoded pieces of a string whose opening quote was already consumed"""
+        while True:
+            try:
+                text, end = scanstring(self._buf, self._pos)
+            except json.JSONDecodeError:
+                pass
+            else:
+                self._pos = end
+                if text:
+                    yield text
+                return
+            # The string runs past the buffer: decode up to the last complete escape
+            for cut in range(len(self._buf), max(self._pos, len(self._buf) - 6) - 1, -1):
+                try:
+                    text = scanstring(self._buf[self._pos:cut] + '"', 0)[0]
+                    break
+                except json.JSONDecodeError:
+                    continue
+            else:
+                raise ValueError("Invalid string in JSON response")
+            if text and "\ud800" <= text[-1] <= "\udbff":
+                # Hold back a high surrogate escape until its low surrogate arrives
+                text = text[:-1]
+                cut -= 6
+            self._pos = cut
+            if text:
+                yield text
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON response")
+
+    def skip_value(self):
+        """Consume the next value without parsing it"""
+        c = self.peek()
+        if c == "":
+            raise ValueError("Unexpected end of JSON response")
+        self._pos += 1
+        if c == '"':
+            for _ in self._iter_string_rest():
+                pass
+        elif c in "[{":
+            depth = 1
+            while depth:
+                m = _CONTAINER_SPECIAL.search(self._buf, self._pos)
+                if not m:
+                    self._pos = len(self._buf)
+                    if not self._fill():
+                        raise ValueError("Unexpected end of JSON response")
+                    continue
+                self._pos = m.end()
+                token = m.group()
+                if token == '"':
+                    for _ in self._iter_string_rest():
+                        pass
+                else:
+                    depth += 1 if token in "[{" else -1
+        else:
+            while True:
+                m = _SCALAR_END.search(self._buf, self._pos)
+                if m:
+                    self._pos = m.start()
+                    return
+                self._pos = len(self._buf)
+                if not self._fill():
+                    return
+
+    def read_value(self) -> Any:
+        """Consume and parse the next value"""
+        c = self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                # Read more only if the value was cut off at the end of the buffer;
+                # an error earlier in the buffer is malformed input
+                cut_off = e.pos >= len(self._buf) - 6 or e.msg == "Unterminated string starting at"
+                if not cut_off or not self._fill(max(len(self._buf) - self._pos, 1)):
+                    raise
+                continue
+            # A number ending at the buffer boundary may continue in the next chunk
+            if end == len(self._buf) and c not in '"[{' and self._fill():
+                continue
+            self._pos = end
+            return value
+
+    def iter_members(self) -> Iterator[str]:
+        """Yield the keys of the next object; the caller must consume each value"""
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            c = self.peek()
+            self._pos += 1
+            if c == "}":
+                return
+            if c != ",":
+                raise ValueError(f"Expected ',' or '}}' in JSON response, found '{c}'")
+
+    def iter_items(self) -> Iterator[None]:
+        """Step through the next array; the caller must consume each element"""
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield None
+            c = self.peek()
+            self._pos += 1
+            if c == "]":
+                return
+            if c != ",":
+                raise ValueError(f"Expected ',' or ']' in JSON response, found '{c}'")
+
+    def iter_string(self) -> Iterator[str]:
+        """Yield the decoded contents of the next string value, one buffer at a time"""
+        self._expect('"')
+        yield from self._iter_string_rest()
+
+
+class SpooledResponse:
+    """A JSON-RPC response too large to hold in memory, spooled to a temporary file.
+
+    Iterating yields the objects returned by a tool call (e.g. the rows of a
+    ``query``) one at a time, parsing each from disk as it is reached. Text
+    content that is not JSON, including text that merely starts with a bracket,
+    is yielded as a string.
+    """
+
+    def __init__(self, spool_file, size: int):
+        self.size = size
+        self._file = spool_file
+        self._payload_offset = self._find_payload_offset()
+
+    def _find_payload_offset(self) -> int:
+        """Locate the JSON payload, skipping any SSE fields and comments before the data line"""
+        self._file.seek(0)
+        if self._file.read(SSE_LINE_LIMIT).lstrip().startswith(b"{"):
+            return 0  # Plain JSON body
+        self._file.seek(0)
+        while True:
+            line_start = self._file.tell()
+            line = self._file.readline(SSE_LINE_LIMIT)
+            if not line:
+                return 0
+            if line.startswith(b"data:"):
+                return line_start + (6 if line.startswith(b"data: ") else 5)
+            # Skip the remainder of an over-long non-data line
+            while not line.endswith(b"\n"):
+                line = self._file.readline(SSE_LINE_LIMIT)
+                if not line:
+                    return 0
+
+    def _read_chunks(self) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        pos = self._payload_offset
+        while True:
+            # Seek on every read so that independent iterations do not interfere
+            self._file.seek(pos)
+            chunk = self._file.read(READ_CHUNK_SIZE)
+            if not chunk:
+                yield decoder.decode(b"", final=True)
+                return
+            pos += len(chunk)
+            yield decoder.decode(chunk)
+
+    def _stream(self) -> _JsonStream:
+        return _JsonStream(self._read_chunks())
+
+    def error(self) -> Optional[Any]:
+        """Return the JSON-RPC error, or a summary of a tool result flagged isError
+
+        The summary holds up to ERROR_MESSAGE_LIMIT values read from the result's
+        content. Returns None for a successful result.
+        """
+        stream = self._stream()
+        for key in stream.iter_members():
+            if key == "error":
+                return stream.read_value()
+            if key == "result":
+                # A response carries either result or error, so stop here
+                if self._is_tool_error():
+                    return {"isError": True, "messages": list(itertools.islice(self, ERROR_MESSAGE_LIMIT))}
+                return None
+            stream.skip_value()
+        return None
+
+    def _is_tool_error(self) -> bool:
+        # isError is normally the last member of the result, so check the end of
+        # the file first rather than skipping over the whole result
+        self._file.seek(0, 2)
+        self._file.seek(max(self._file.tell() - 256, self._payload_offset))
+        tail = self._file.read().decode("utf-8", errors="ignore")
+        m = _TRAILING_IS_ERROR.search(tail)
+        if m:
+            return m.group(1) == "true"
+        stream = self._stream()
+        for key in stream.iter_members():
+            if key != "result":
+                stream.skip_value()
+                continue
+            for key in stream.iter_members():
+                if key == "isError":
+                    return stream.read_value() is True
+                stream.skip_value()
+            return False
+        return False
+
+    def __iter__(self) -> Iterator[Any]:
+        stream = self._stream()
+        for key in stream.iter_members():
+            if key != "result":
+                stream.skip_value()
+                continue
+            for key in stream.iter_members():
+                if key != "content":
+                    stream.skip_value()
+                    continue
+                for _ in stream.iter_items():
+                    yield from self._iter_content_item(stream)
+                return  # Nothing after content (e.g. structuredContent) is needed
+
+    def _iter_content_item(self, stream: _JsonStream) -> Iterator[Any]:
+        for key in stream.iter_members():
+            if key != "text":
+                stream.skip_value()
+                continue
+            text_chunks = stream.iter_string()
+            # Keep the text until its first value parses, so that text which turns
+            # out not to be JSON can still be yielded as a string
+            head: List[str] = []
+            recording = True
+
+            def recorded_chunks() -> Iterator[str]:
+                for chunk in text_chunks:
+                    if recording:
+                        head.append(chunk)
+                    yield chunk
+
+            chunks = recorded_chunks()
+            values = self._iter_json_text(_JsonStream(chunks))
+            try:
+                first = next(values, _END)
+            except ValueError:
+                for _ in chunks:
+                    pass
+                text = "".join(head)
+                try:
+                    # A scalar such as an aggregate, or plain text such as an error message
+                    value = json.loads(text)
+                except ValueError:
+                    value = text
+                yield value
+                continue
+            recording = False
+            head.clear()
+            if first is not _END:
+                yield first
+                yield from values
+            for _ in text_chunks:
+                pass  # Leave the outer stream positioned after the string
+
+    @staticmethod
+    def _iter_json_text(inner: _JsonStream) -> Iterator[Any]:
+        """Yield each value of a JSON array, or a single JSON object"""
+        c = inner.peek()
+        if c == "[":
+            for _ in inner.iter_items():
+                yield inner.read_value()
+        elif c == "{":
+            yield inner.read_value()
+        else:
+            raise ValueError("Text content is not a JSON array or object")
+
+    def close(self):
+        """Delete the spool file"""
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
 class MCPClient:
-    def __init__(self):
+    def __init__(self, max_response_bytes: Optional[int] = None, spool_dir: Optional[str] = None):
         self.process = None
         self.base_url = None
         self.connection_type = None
         self.request_id = 1
         self.initialized = False
         self.session_id = None  # Add session ID for HTTP mode
+        self.max_response_bytes = max_response_bytes  # Tool results above this size are spooled to disk
+        self.spool_dir = spool_dir  # Directory for spool files (system temp dir if None)
 
     def connect_stdio(self, server_command=None, server_pid=0):
         """Connect to MCP server via stdio and ensure it stays alive"""
@@ -260,7 +610,37 @@ class MCPClient:
             except json.JSONDecodeError:
                 raise ValueError(f"No valid data found in response: {response_text}")
 
-    def _send_stdio_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _spool(self, chunks: Iterable[bytes]) -> Union[bytes, SpooledResponse]:
+        """Buffer response bytes in memory, moving them to a temporary file past max_response_bytes"""
+        buffered = []
+        size = 0
+        spool_file = None
+        for chunk in chunks:
+            size += len(chunk)
+            if spool_file is not None:
+                spool_file.write(chunk)
+                continue
+            buffered.append(chunk)
+            if size > self.max_response_bytes:
+                spool_file = tempfile.TemporaryFile(dir=self.spool_dir)
+                spool_file.writelines(buffered)
+                buffered = None
+        if spool_file is None:
+            return b"".join(buffered)
+        spool_file.flush()
+        return SpooledResponse(spool_file, size)
+
+    def _read_stdio_line(self) -> Iterator[bytes]:
+        """Read one line from the server's stdout in bounded chunks"""
+        while True:
+            chunk = self.process.stdout.readline(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk.encode("utf-8")
+            if chunk.endswith("\n"):
+                return
+
+    def _send_stdio_message(self, message: Dict[str, Any], spool: bool = False) -> Optional[Union[Dict[str, Any], SpooledResponse]]:
         """Send message via stdio and get response"""
         if not self.process:
             print("❌ No process available")
@@ -287,7 +667,14 @@ class MCPClient:
                 print("📤 Notification sent (no response expected)")
                 return {"success": True}
 
-            stdout_output = self.process.stdout.readline()
+            if spool and self.max_response_bytes is not None:
+                spooled = self._spool(self._read_stdio_line())
+                if isinstance(spooled, SpooledResponse):
+                    print(f"📥 Received: {spooled.size} bytes (spooled to disk)")
+                    return spooled
+                stdout_output = spooled.decode("utf-8")
+            else:
+                stdout_output = self.process.stdout.readline()
             if stdout_output:
                 if stdout_output.strip():
                     print(f"📥 Received: {stdout_output.strip()}")
@@ -301,7 +688,7 @@ class MCPClient:
             print(f"❌ Error in stdio communication: {e}")
             return None
 
-    def _send_http_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _send_http_message(self, message: Dict[str, Any], spool: bool = False) -> Optional[Union[Dict[str, Any], SpooledResponse]]:
         """Send message via HTTP using FastMCP streaming protocol"""
         if not self.base_url:
             print("❌ Base URL not provided for HTTP")
@@ -320,11 +707,13 @@ class MCPClient:
             if self.session_id:
                 headers['mcp-session-id'] = self.session_id
             
+            spool = spool and self.max_response_bytes is not None
             response = requests.post(
                 self.base_url,
                 json=message,
                 headers=headers,
-                timeout=30
+                timeout=30,
+                stream=spool
             )
             
             # Extract session ID from response headers if present
@@ -332,12 +721,29 @@ class MCPClient:
                 self.session_id = response.headers['mcp-session-id']
                 print(f"📋 Session ID: {self.session_id}")
             
+            # Read the body, spooling a successful response to disk if it is too large
+            try:
+                if response.status_code == 200 and spool:
+                    spooled = self._spool(response.iter_content(READ_CHUNK_SIZE))
+                    if isinstance(spooled, SpooledResponse):
+                        print(f"📥 Received HTTP: {spooled.size} bytes (spooled to disk)")
+                        return spooled
+                    response_text = spooled.decode("utf-8")
+                else:
+                    response_text = response.text
+            finally:
+                response.close()
+
             # Handle different response scenarios
             if response.status_code == 200:
-                if response.text.strip():
+                if response_text.strip():
                     # Parse SSE format response
-                    result = self._parse_sse_response(response.text)
-                    print(f"📥 Received HTTP: {json.dumps(result, indent=2)}")
+                    result = self._parse_sse_response(response_text)
+                    if spool:
+                        # Print the body as received rather than re-dumping a possibly large result
+                        print(f"📥 Received HTTP: {response_text.strip()}")
+                    else:
+                        print(f"📥 Received HTTP: {json.dumps(result, indent=2)}")
                     return result
                 else:
                     # Empty response (likely a notification)
@@ -346,8 +752,8 @@ class MCPClient:
             else:
                 # Handle error responses
                 try:
-                    if response.text.startswith('event:') or response.text.startswith('data:'):
-                        error_data = self._parse_sse_response(response.text)
+                    if response_text.startswith('event:') or response_text.startswith('data:'):
+                        error_data = self._parse_sse_response(response_text)
                     else:
                         error_data = response.json()
                     print(f"❌ HTTP Error: {error_data}")
@@ -359,16 +765,20 @@ class MCPClient:
             print(f"❌ Error in HTTP communication: {e}")
             return None
 
-    def send_message(self, message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Send message using the appropriate transport"""
+    def send_message(self, message: Dict[str, Any], spool: bool = False) -> Optional[Union[Dict[str, Any], SpooledResponse]]:
+        """Send message using the appropriate transport
+
+        With spool=True and max_response_bytes set, a response larger than the
+        limit is returned as a SpooledResponse instead of a parsed dict.
+        """
         if not self.initialized:
             print("❌ Client not initialized. Call connect_stdio or connect_http first.")
             return None
             
         if self.connection_type == "stdio":
-            return self._send_stdio_message(message)
+            return self._send_stdio_message(message, spool)
         elif self.connection_type == "http":
-            return self._send_http_message(message)
+            return self._send_http_message(message, spool)
         else:
             print("❌ No connection established")
             return None
@@ -399,8 +809,12 @@ class MCPClient:
             print("❌ Failed to get tools list")
             return []
 
-    def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
-        """Call a specific tool"""
+    def call_tool(self, tool_name: str, arguments: Optional[Dict[str, Any]] = None) -> Optional[Union[Dict[str, Any], SpooledResponse]]:
+        """Call a specific tool
+
+        Returns the result dict, or a SpooledResponse iterating over the returned
+        objects when the response exceeds max_response_bytes.
+        """
         print(f"\n🛠️  Calling tool: {tool_name}")
         if arguments:
             print(f"   Arguments: {arguments}")
@@ -413,15 +827,44 @@ class MCPClient:
                 "name": tool_name,
                 "arguments": arguments or {}
             }
-        })
+        }, spool=True)
 
-        if response and "result" in response:
-            print(f"✅ Tool result: {json.dumps(response['result'], indent=2)}")
+        if isinstance(response, SpooledResponse):
+            try:
+                error = response.error()
+            except ValueError as e:
+                error = f"unreadable spooled response: {e}"
+            if error is None:
+                print(f"✅ Tool result: {response.size} bytes, exceeds {self.max_response_bytes}-byte limit; spooled to disk")
+                return response
+            response.close()
+            print(f"❌ Tool call failed: {error}")
+            return None
+        elif response and "result" in response:
+            if self.max_response_bytes is None:
+                print(f"✅ Tool result: {json.dumps(response['result'], indent=2)}")
+            else:
+                # Already printed as received; a second dump would copy the result again
+                print("✅ Tool result received (within the response size limit)")
             return response["result"]
         else:
             print(f"❌ Tool call failed: {response}")
             return None
 
+    def print_spooled_result(self, result: Any):
+        """Print a spooled tool result one object at a time, then delete its spool file"""
+        if not isinstance(result, SpooledResponse):
+            return  # In-memory results are already printed by call_tool
+
+        count = 0
+        with result:
+            try:
+                for count, obj in enumerate(result, 1):
+                    print(json.dumps(obj, indent=2))
+            except ValueError as e:
+                print(f"❌ Failed to read spooled result: {e}")
+        print(f"📋 {count} object(s) read from spooled result")
+
     def list_resources(self) -> List[Dict[str, Any]]:
         """Get list of available resources"""
         print("\n📚 Listing available resources...")
@@ -484,7 +927,7 @@ class MCPClient:
                 arguments = self._get_demo_arguments(tool)
 
                 print(f"\n--- Calling {tool_name} ---")
-                self.call_tool(tool_name, arguments)
+                self.print_spooled_result(self.call_tool(tool_name, arguments))
 
                 # Small delay between calls
                 time.sleep(1)
@@ -573,6 +1016,17 @@ def main():
         help="URL of HTTP MCP server"
     )
 
+    # Response memory options
+    parser.add_argument(
+        "--max_response_bytes",
+        type=int,
+        help="Spool tool results larger than this many bytes to a temporary file instead of holding them in memory"
+    )
+    parser.add_argument(
+        "--spool_dir",
+        help="Directory for spooled tool results (default: system temp directory)"
+    )
+
     # Action options
     parser.add_argument(
         "--demo",
@@ -582,7 +1036,7 @@ def main():
 
     args = parser.parse_args()
 
-    client = MCPClient()
+    client = MCPClient(max_response_bytes=args.max_response_bytes, spool_dir=args.spool_dir)
 
     try:
         # Connect based on mode
@@ -627,9 +1081,10 @@ def main():
                         args_json = parts[2] if len(parts) > 2 else "{}"
                         try:
                             arguments = json.loads(args_json)
-                            client.call_tool(tool_name, arguments)
                         except json.JSONDecodeError as e:
                             print(f"❌ Invalid JSON arguments: {e}")
+                        else:
+                            client.print_spooled_result(client.call_tool(tool_name, arguments))
                     elif command.startswith("read "):
                         parts = command.split(" ", 2)
                         resource_name = parts[1]